@@ -20,106 +20,274 @@ CHT temp    pct  time (seconds)
 280-289    5.60  234
 290-299    4.31  180
 
+The histogram for each log is cached in a file next to it named
+<log>.cht-cache, so running again over the same logs skips parsing
+them. A cache file is ignored if the log has changed since it was written.
 """
 
+from concurrent.futures import ProcessPoolExecutor
 from flight_log import FlightLog
 from flight_log import FlightLogException
+from flight_log import HEADER_CACHE_SUFFIX
+from flight_log import cache_key
+from flight_log import save_json_cache
+from itertools import compress
+import json
+from operator import sub
 import sys
 
 
-def temperatureSlot(temp):
-    """
-    Round temperature down to the nearest multiple of 10, with a floor of 0.
-    """
-    if temp < 0:
-        return 0
-    return int(temp / 10) * 10
+# Initial number of 10-degree slots in a histogram; this covers 0-799
+# degrees. A histogram is extended if a hotter reading shows up.
+TEMP_SLOT_COUNT = 80
 
+# Suffix for the per-log histogram cache files. Bump CACHE_VERSION
+# whenever the way a histogram is computed changes, so old cache files
+# get ignored.
+CACHE_SUFFIX = '.cht-cache'
+CACHE_VERSION = 3
 
-def read_log(filename, temp_slots):
+
+def read_log(filename):
+    """
+    Read one log and return (temp_slots, slot_range, complete).
+    temp_slots is a histogram of its own, a list where element i is the
+    cylinder*seconds spent between i*10 and i*10+9 degrees. slot_range is
+    [lowest, highest] index of a slot that got any reading, even one
+    that added no time, or [] if none did. Histograms from different logs
+    can be combined with merge_slots(). complete is False if reading
+    stopped early on a bad value, so the histogram only covers part
+    of the log.
+    """
     log = FlightLog.open(filename)
     cht_col_names = log.col_cht()
+    temp_slots = [0] * TEMP_SLOT_COUNT
+    slot_range = []
 
     # if the log is from a jet, there are no CHT columns, so skip the file
     if not cht_col_names:
-        return
-    
+        return temp_slots, slot_range, True
+
     column_names = ['elapsed',
                     log.col_rpm(),
                     *cht_col_names]
-    data = log.read(column_names)
-    n_rows = len(data[0])
-    n_cols = len(column_names)
-
-    # map temperature slots (multiples of 10) to the number of
-    # cylinder*seconds spent in that slot
 
+    # feed the log through a piece at a time, so only one chunk of
+    # columns is in memory at once
     prev_time = 0
-    for r in range(n_rows):
-        
-        # ignore entries when the engine is off (RPM < 500)
-        rpm = data[1][r]
-        if rpm == None or rpm < 500: continue
+    for data in log.read_chunks(column_names):
+        prev_time = accumulate(data[0], data[1], data[2:], temp_slots,
+                               slot_range, prev_time)
 
-        # ignore entries before we know what time it is
-        elapsed = data[0][r]
-        if elapsed == None: continue
-        
-        time_slice = elapsed - prev_time
-        prev_time = elapsed
+    return temp_slots, slot_range, log.read_error is None
+
+
+def read_log_slots(filename):
+    """
+    Like read_log(), but use the cached histogram if there is one,
+    and return just (temp_slots, slot_range).
+    Logs are independent, so this is the unit of work handed to each
+    worker process.
+    """
+    cached = load_cached_slots(filename)
+    if cached:
+        return cached
+
+    temp_slots, slot_range, complete = read_log(filename)
+    # Don't cache a partial histogram; the next run would quietly
+    # use it without reporting the error.
+    if complete:
+        save_cached_slots(filename, temp_slots, slot_range)
+    return temp_slots, slot_range
+
+
+def load_cached_slots(filename):
+    """
+    Returns the cached (temp_slots, slot_range) for the given log, or None
+    if there isn't an up-to-date one. Cache files are JSON rather than pickle, so a
+    cache file that came along with someone else's logs can't run code.
+    """
+    try:
+        with open(filename + CACHE_SUFFIX) as inf:
+            key, temp_slots, slot_range = json.load(inf)
+        if (key == cache_key(CACHE_VERSION, filename)
+                and all(type(time) is int for time in temp_slots)
+                and len(slot_range) in (0, 2)
+                and all(type(idx) is int for idx in slot_range)):
+            return temp_slots, slot_range
+    except Exception:
+        # missing, unreadable, or from some other version; just reparse
+        pass
+    return None
+
+
+def save_cached_slots(filename, temp_slots, slot_range):
+    """
+    Cache the histogram for the given log.
+    """
+    save_json_cache(filename + CACHE_SUFFIX,
+                    [cache_key(CACHE_VERSION, filename), temp_slots,
+                     slot_range])
+
+
+def merge_slots(total, total_range, temp_slots, slot_range):
+    """
+    Add the histogram temp_slots into total, and widen total_range to
+    cover slot_range.
+    """
+    if len(temp_slots) > len(total):
+        total.extend([0] * (len(temp_slots) - len(total)))
+    for idx, time in enumerate(temp_slots):
+        total[idx] += time
+    if slot_range:
+        widen_range(total_range, *slot_range)
+
+
+def widen_range(slot_range, min_idx, max_idx):
+    """
+    Stretch slot_range, a [lowest, highest] pair of slot indexes that is
+    empty until the first reading, to cover min_idx through max_idx.
+    """
+    if slot_range:
+        slot_range[0] = min(slot_range[0], min_idx)
+        slot_range[1] = max(slot_range[1], max_idx)
+    else:
+        slot_range[:] = [min_idx, max_idx]
+
+
+def slot_index(temp):
+    """
+    Index of the 10-degree slot a temperature falls in, with a floor of 0.
+    accumulate() does the same calculation inline for every reading.
+    """
+    return 0 if temp < 0 else int(temp) // 10
+
+
+def accumulate(elapsed_col, rpm_col, cht_cols, temp_slots, slot_range,
+               prev_time=0):
+    """
+    Add cylinder*seconds from one batch of rows to temp_slots, a list
+    where temp_slots[i] is the time spent between i*10 and i*10+9 degrees.
+    slot_range is widened to cover every slot that gets a reading, even
+    one whose time slice is 0, since report() prints all of those.
+
+    prev_time is the elapsed time of the last row counted before this
+    batch. The elapsed time of the last row counted in this batch is
+    returned, so a log can be fed through in pieces.
+    """
+
+    # Pick out the rows worth counting up front, so the main loop only
+    # sees those. Ignore entries when the engine is off (RPM < 500) and
+    # entries before we know what time it is.
+    valid = [rpm is not None and rpm >= 500 and elapsed is not None
+             for elapsed, rpm in zip(elapsed_col, rpm_col)]
+
+    # nothing to count, for example ground-only logs or engine-off stretches
+    if not any(valid):
+        return prev_time
+
+    # Work out how long each counted row lasted: the difference between
+    # its elapsed time and that of the previous counted row.
+    times = list(compress(elapsed_col, valid))
+    time_slices = list(map(sub, times, [prev_time] + times[:-1]))
+    prev_time = times[-1]
+
+    # Then walk one cylinder column at a time. The columns are already
+    # stored this way, so no per-row tuple of readings has to be built.
+    for cht_col in cht_cols:
+        readings = list(compress(cht_col, valid))
+
+        # note the coolest and hottest slots this column reaches
+        try:
+            lowest, highest = min(readings), max(readings)
+        except TypeError:
+            # some readings are missing, which is rare
+            present = [cht for cht in readings if cht is not None]
+            lowest = min(present, default=None)
+            highest = max(present, default=None)
+        if lowest is not None:
+            widen_range(slot_range, slot_index(lowest), slot_index(highest))
+
+        for time_slice, cht in zip(time_slices, readings):
+            if cht is None: continue
+
+            # round down to a multiple of 10 degrees, with a floor of 0
+            idx = 0 if cht < 0 else int(cht) // 10
+
+            try:
+                temp_slots[idx] += time_slice
+            except IndexError:
+                temp_slots.extend([0] * (idx + 1 - len(temp_slots)))
+                temp_slots[idx] += time_slice
+
+    return prev_time
 
-        for c in range(2, n_cols):
-            cht = data[c][r]
-            if cht == None: continue
-            slot = temperatureSlot(cht)
-            
-            temp_slots[slot] = time_slice + temp_slots.get(slot, 0)
-            # print(f'{slot} += {time_slice}')
-        # print()
-        
     
-def report(temp_slots):
+def report(temp_slots, slot_range):
     """
-    By using a hash table to track the temperature slots, there
-    may be gaps. For example: {300: x, 310: y, 330: z}
-    Find the min and max, and step through the full range, even if
-    some slots are empty.
+    Print the temperature slots in slot_range, from the lowest to the
+    highest one that got any reading, including empty slots in between.
     """
-    key_list = list(temp_slots.keys())
-    if not key_list:
+    if not slot_range:
         print('No data')
         return
-    
-    key_list.sort()
-    min_slot = key_list[0]
-    max_slot = key_list[-1]
 
-    total_time = sum(temp_slots.values())
+    min_idx, max_idx = slot_range
+
+    total_time = sum(temp_slots)
 
-    print('CHT temp    pct  time (seconds)')
-    for slot in range(min_slot, max_slot+10, 10):
+    # Every empty slot prints the same figures, so format them once.
+    # This is written as the computation it stands for, rather than a
+    # literal ' 0.00  0', because total_time can be negative (elapsed time
+    # can go backwards in a log), and then empty slots print as -0.00.
+    empty = f'{100.0 * 0 / total_time:6.2f}  0'
+
+    lines = ['CHT temp    pct  time (seconds)']
+    for idx in range(min_idx, max_idx+1):
+        slot = idx * 10
         slot_label = f'{slot}-{slot+9}'
-        time = temp_slots.get(slot, 0)
-        pct = 100.0 * time / total_time
-        print(f'{slot_label:>7}  {pct:6.2f}  {time}')
+        time = temp_slots[idx]
+        if time:
+            pct = 100.0 * time / total_time
+            lines.append(f'{slot_label:>7}  {pct:6.2f}  {time}')
+        else:
+            lines.append(f'{slot_label:>7}  {empty}')
+    print('\n'.join(lines))
         
 
 
 def main(args):
-    temp_slots = {}
+    temp_slots = [0] * TEMP_SLOT_COUNT
+    slot_range = []
+
+    # Skip our own cache files and FlightLog's, so "cht_ranges.py logs/*"
+    # works the second time around too.
+    args = [filename for filename in args
+            if not filename.endswith((CACHE_SUFFIX, HEADER_CACHE_SUFFIX))]
 
-    for i, filename in enumerate(args):
+    if len(args) == 1:
+        # not worth starting worker processes for a single log
         try:
-            read_log(filename, temp_slots)
-            if len(args) > 1:
-                sys.stdout.write(f'\r{i+1} of {len(args)} logs read')
+            merge_slots(temp_slots, slot_range, *read_log_slots(args[0]))
         except FlightLogException as e:
-            sys.stderr.write(f'\nError reading {filename}: ' + str(e) + '\n')
+            sys.stderr.write(f'\nError reading {args[0]}: ' + str(e) + '\n')
+
+    elif len(args) > 1:
+        # Read the logs in parallel, each into its own histogram, and
+        # merge the results in order as they are collected.
+        with ProcessPoolExecutor() as executor:
+            futures = [executor.submit(read_log_slots, filename)
+                       for filename in args]
+            for i, (filename, future) in enumerate(zip(args, futures)):
+                try:
+                    merge_slots(temp_slots, slot_range, *future.result())
+                    sys.stdout.write(f'\r{i+1} of {len(args)} logs read')
+                except FlightLogException as e:
+                    sys.stderr.write(f'\nError reading {filename}: ' + str(e) + '\n')
 
-    if len(args) > 1:
         sys.stdout.write('\n')
             
-    report(temp_slots)
+    report(temp_slots, slot_range)
     
 
 if __name__ == '__main__':
@@ -23,6 +23,18 @@ each column listed, and return a list of lists:
   data[1] = 'Latitude' column data
   data[2] = 'Longitude' column data
 
+To process a long file without holding all of it in memory, read it
+in pieces of up to 8192 rows, each in the same form as read() returns:
+  for data in log.read_chunks(['elapsed', 'Latitude', 'Longitude']):
+    ...
+
+FlightLog.open() can cache what it learns from a log's headers in a
+file named <log>.flog-cache.json next to it, so opening the same log
+again skips reading the headers. A cache file is ignored if the log has
+changed since it was written. This is off by default, since opening a
+log is already quick; to turn it on:
+  log = FlightLog.open('log_161119_154619_KEYW.csv', use_cache=True)
+
 Avidyne and Garmin use different names for the same data, so there
 are methods on the FlightLog object to provide the appropriate name
 for the given file.
@@ -50,9 +62,17 @@ Some oddities to know about:
 """
 
 
+from concurrent.futures import ProcessPoolExecutor
 import csv
+from datetime import date
 from datetime import datetime
 from datetime import timedelta
+from functools import lru_cache
+import io
+from itertools import islice
+from itertools import repeat
+import json
+import os
 import re
 import sys
 
@@ -63,6 +83,23 @@ VENDOR_GARMIN = 'garmin'
 COLUMN_NAME_TIMESTAMP = 'timestamp'
 COLUMN_NAME_ELAPSED = 'elapsed'
 
+# Character encoding of log files. Latin-1 maps every byte to a character,
+# so odd bytes (see samples/README) can't cause decoding errors.
+LOG_ENCODING = 'Latin-1'
+SECONDS_PER_DAY = 24 * 60 * 60
+
+# FlightLog.open(use_cache=True) saves what it learns from a log's headers
+# in a file with this suffix next to the log. Bump HEADER_CACHE_VERSION
+# whenever the constructors change what they compute, so old cache files
+# get ignored.
+HEADER_CACHE_SUFFIX = '.flog-cache.json'
+HEADER_CACHE_VERSION = 1
+
+# FlightLog.read_parallel() splits a file into one piece per worker,
+# but no piece smaller than this, so a small file is read by a single
+# process.
+PARALLEL_MIN_BYTES = 1 << 20
+
 
 def parse_float(string):
     """
@@ -75,9 +112,14 @@ def parse_float(string):
         return None
 
 
+@lru_cache(maxsize=8192)
 def parse_int(string):
     """
     Parse an integer or return None on failure.
+    Integer columns (RPM, temperatures, ...) repeat the same few values
+    over and over, so results are cached. parse_float() is not cached,
+    because float columns like latitude rarely repeat and the cache
+    misses cost more than they save.
     """
     try:
         return int(string)
@@ -89,21 +131,192 @@ def parse_int(string):
 INT_RE = re.compile(r'\d+')
 
 
+@lru_cache(maxsize=8192)
 def parse_int_tuple(string):
     """
     Given a string containing multiple positive integers, return a tuple
     of them.  "2025-10-31" -> (2025, 10, 31)
+    Results are cached, since a date is repeated on every row of a log.
     """
     return tuple(int(int_str) for int_str in INT_RE.findall(string))
 
 
+def parse_time(string):
+    """
+    Parse a time of day "HH:MM:SS" into a tuple of integers.
+    This is a fast path for the common case; anything else is handed to
+    parse_int_tuple(). Times are nearly all distinct, so unlike dates
+    there's little to gain from parse_int_tuple()'s cache.
+    """
+    try:
+        hour, minute, second = string.split(':')
+        return int(hour), int(minute), int(second)
+    except ValueError:
+        return parse_int_tuple(string)
+
+
+# how to parse strings into each of the column types ColumnDef supports
+COLUMN_PARSERS = {
+    float: parse_float,
+    int: parse_int,
+    str: str.strip,
+}
+
+
+def decode_lines(inf):
+    """
+    Given a file opened in binary mode, generate its lines as strings.
+    Decoding each line directly is cheaper than going through a text-mode
+    file, and the file position stays a plain byte offset.
+    """
+    return map(bytes.decode, inf, repeat(LOG_ENCODING))
+
+
+def read_cr_lines(inf, block_size=1 << 16):
+    """
+    Generate the lines of a binary file, each with its line ending, like
+    iterating the file does, but also ending a line at a bare '\r'.
+    Logs saved with old Mac-style line endings use only '\r'.
+    """
+    pending = b''
+    while True:
+        block = inf.read(block_size)
+        if not block:
+            break
+        lines = (pending + block).splitlines(keepends=True)
+
+        # The last piece may continue in the next block, or it may end in
+        # a '\r' that's half of a '\r\n', so hold it back.
+        pending = lines.pop()
+        if pending.endswith(b'\n'):
+            lines.append(pending)
+            pending = b''
+        yield from lines
+
+    if pending:
+        yield pending
+
+
+class CRLineFile:
+    """
+    Wraps a binary file whose lines end in a bare '\r', so iterating it
+    generates lines the same way iterating a normal file does for '\n'.
+    Everything else (seek, tell, fileno, close, ...) goes straight to
+    the file, so only seek to the start of a line, and don't count on
+    tell() while iterating.
+    """
+
+    def __init__(self, inf):
+        self.inf = inf
+
+    def __iter__(self):
+        return read_cr_lines(self.inf)
+
+    def __getattr__(self, name):
+        return getattr(self.inf, name)
+
+
+def open_log_file(filename):
+    """
+    Open a log in binary mode and read its three header lines, which
+    Avidyne and Garmin logs both have.
+    Returns (inf, raw_lines), with inf positioned after the headers.
+
+    If the lines end in a bare '\r', readline() will have read far past
+    the first one, so the file is wrapped in a CRLineFile and the
+    headers are read again from the start.
+    """
+    inf = open(filename, 'rb')
+    raw_lines = [inf.readline() for i in range(3)]
+
+    if b'\r' in raw_lines[0].rstrip(b'\r\n'):
+        inf.seek(0)
+        inf = CRLineFile(inf)
+        lines = iter(inf)
+        raw_lines = [next(lines, b'') for i in range(3)]
+        inf.seek(sum(map(len, raw_lines)))
+
+    return inf, raw_lines
+
+
+def cache_key(version, file):
+    """
+    Identify the current contents of a log, given its filename or the
+    file descriptor of an open copy, by its modification time and size.
+    version is the format version of the cache the key is for.
+    """
+    st = os.stat(file)
+    return [version, st.st_mtime_ns, st.st_size]
+
+
+def save_json_cache(cache_filename, value):
+    """
+    Write value as JSON to the given cache file. Caches are only an
+    optimization, so any failure (for example, a read-only directory)
+    is ignored.
+
+    The file is written under a temporary name and then renamed into
+    place, so a concurrent reader never sees a partly written one.
+    """
+    temp_filename = f'{cache_filename}.{os.getpid()}.tmp'
+    try:
+        with open(temp_filename, 'w') as outf:
+            json.dump(value, outf)
+        os.replace(temp_filename, cache_filename)
+    except Exception:
+        try:
+            os.remove(temp_filename)
+        except OSError:
+            pass
+
+
+def split_lines(lines):
+    """
+    Split lines of comma-separated values into lists of fields, for files
+    that don't normally use quoting. This gives the same rows as
+    csv.reader, including an empty row for a blank line, in about half
+    the time. A line that does contain a quote is handed to csv.reader,
+    so a quoted comma late in the file can't shift the fields.
+    """
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if '"' in line:
+            yield next(csv.reader([line]))
+        else:
+            yield line.split(',') if line else []
+
+
+def check_time_of_day(hour, minute, second):
+    """
+    Raise ValueError, with the same message datetime() would give, if
+    hour:minute:second isn't a valid time of day. For readers that do
+    their own time arithmetic instead of building a datetime.
+    """
+    if not 0 <= hour <= 23:
+        raise ValueError('hour must be in 0..23')
+    if not 0 <= minute <= 59:
+        raise ValueError('minute must be in 0..59')
+    if not 0 <= second <= 59:
+        raise ValueError('second must be in 0..59')
+
+
+def time_of_day_seconds(t):
+    """
+    Given a datetime, return the number of seconds since midnight.
+    """
+    return t.hour * 3600 + t.minute * 60 + t.second
+
+
 class ColumnDef:
     """
     Encapsulates a column name and data type.
     All inputs are strings. The data type determines what those strings
     should be parsed into. Failed parses result in values of None.
     """
-    
+
+    # there are a lot of these, and they never get new attributes
+    __slots__ = ('name', 'column_type', 'parse')
+
     def __init__(self, name, column_type = str):
         """
         column_type: int, float, or str
@@ -112,13 +325,9 @@ class ColumnDef:
         self.name = name
         self.column_type = column_type
 
-        if self.column_type == float:
-            self.parse = parse_float
-        elif self.column_type == int:
-            self.parse = parse_int
-        elif self.column_type == str:
-            self.parse = lambda x: x.strip()
-        else:
+        try:
+            self.parse = COLUMN_PARSERS[column_type]
+        except KeyError:
             raise FlightLogException(f'ColumnDef unknown column_type: {column_type}')
 
     def __repr__(self):
@@ -172,6 +381,10 @@ AVIDYNE_COLUMN_TABLE = {obj.name: obj for obj in AVIDYNE_COLUMNS}
 AVIDYNE_REQUIRED_COLUMNS = ['TIME', 'LAT', 'E1', 'MAP', 'FF']
 
 
+# cylinder head temperature columns: "C1", "C2", ...
+AVIDYNE_CHT_RE = re.compile(r'C\d')
+
+
 """
 List of recognized columns in Garmin logs.
 
@@ -275,6 +488,13 @@ GARMIN_COLUMN_TABLE = {obj.name: obj for obj in GARMIN_COLUMNS}
 GARMIN_REQUIRED_COLUMNS = ['Lcl Date', 'Latitude', 'E1 FFlow', 'AfcsOn']
 
 
+# cylinder head temperature columns: "E1 CHT1", "E1 CHT2", ...
+GARMIN_CHT_RE = re.compile(r'E\d CHT\d')
+
+# engine RPM columns: "E1 RPM", "E2 RPM", ...
+GARMIN_RPM_RE = re.compile(r'E\d RPM')
+
+
 class ColumnReader:
     """
     Represents one output column using the input ColumnDef and the index
@@ -293,6 +513,16 @@ class ColumnReader:
     def read(self, input_row):
         return self.column_def.parse(input_row[self.input_col_idx])
 
+    def read_column(self, input_rows):
+        """
+        Read this column from each of a list of input rows. Working a
+        column at a time keeps the parse function and column index in
+        locals, rather than looking them up again for every row.
+        """
+        parse = self.column_def.parse
+        input_col_idx = self.input_col_idx
+        return [parse(row[input_col_idx]) for row in input_rows]
+
     def max_col_needed(self):
         """
         Maximum input column needed by this reader.
@@ -312,47 +542,60 @@ class AvidyneTimestampReader(ColumnReader):
         # first timestamp in the input file
         self.start_time = start_time
         self.time_col_idx = time_col_idx
-        
-        # Cache a copy of a 1 day time delta, because if we use it
-        # we'll use it a lot.
-        # yea, yea, this is premature optimization
-        self.one_day = timedelta(days=1)
+
+        # Precompute the start date and the day after it, so each row
+        # needs one datetime constructor and no datetime arithmetic.
+        # The day wrap is decided on seconds since midnight.
+        self.start_seconds = time_of_day_seconds(start_time)
+        next_day = start_time + timedelta(days=1)
+        self.start_ymd = (start_time.year, start_time.month, start_time.day)
+        self.next_ymd = (next_day.year, next_day.month, next_day.day)
 
     def max_col_needed(self):
         return self.time_col_idx
 
     def makeTimestamp(self, input_row):
-        hour_minute_second = parse_int_tuple(input_row[self.time_col_idx])
+        hour_minute_second = parse_time(input_row[self.time_col_idx])
         if len(hour_minute_second) != 3:
             return None
         hour, minute, second = hour_minute_second
-        timestamp = datetime(self.start_time.year, 
-                             self.start_time.month,
-                             self.start_time.day,
-                             hour, minute, second)
 
         # handle day wrap
-        if timestamp < self.start_time:
-            timestamp += self.one_day
+        if hour * 3600 + minute * 60 + second < self.start_seconds:
+            ymd = self.next_ymd
+        else:
+            ymd = self.start_ymd
 
-        return timestamp
+        return datetime(*ymd, hour, minute, second)
         
     def read(self, input_row):
         return self.makeTimestamp(input_row)
 
+    def read_column(self, input_rows):
+        read = self.read
+        return [read(row) for row in input_rows]
+
 
 class AvidyneElapsedReader(AvidyneTimestampReader):
     """
     Generate elapsed column for Avidyne logs
-    """
-    def __init__(self, start_time, time_col_idx):
-        super().__init__(start_time, time_col_idx)
 
+    This works in seconds since midnight rather than building a datetime
+    for every row just to subtract start_time from it.
+    """
     def read(self, input_row):
-        now = self.makeTimestamp(input_row)
-        if now == None:
+        hour_minute_second = parse_time(input_row[self.time_col_idx])
+        if len(hour_minute_second) != 3:
             return None
-        return int((now - self.start_time).total_seconds())
+        hour, minute, second = hour_minute_second
+        check_time_of_day(hour, minute, second)
+        elapsed = hour * 3600 + minute * 60 + second - self.start_seconds
+
+        # handle day wrap
+        if elapsed < 0:
+            elapsed += SECONDS_PER_DAY
+
+        return elapsed
         
         
 class GarminTimestampReader(ColumnReader):
@@ -370,28 +613,48 @@ class GarminTimestampReader(ColumnReader):
         year_month_day = parse_int_tuple(input_row[self.date_col_idx])
         if len(year_month_day) != 3:
             return None
-        hour_minute_second = parse_int_tuple(input_row[self.time_col_idx])
+        hour_minute_second = parse_time(input_row[self.time_col_idx])
         if len(hour_minute_second) != 3:
             return None
         return datetime(*year_month_day, *hour_minute_second)
 
     def read(self, input_row):
         return self.makeTimestamp(input_row)
+
+    def read_column(self, input_rows):
+        read = self.read
+        return [read(row) for row in input_rows]
         
         
 class GarminElapsedReader(GarminTimestampReader):
     """
     Generate elapsed column for Garmin logs
+
+    This works in days and seconds since midnight rather than building
+    a datetime for every row just to subtract start_time from it.
     """
     def __init__(self, start_time, date_col_idx, time_col_idx):
         super().__init__(date_col_idx, time_col_idx)
         self.start_time = start_time
 
+        # start_time is None if no row has a timestamp, in which case
+        # read() never gets far enough to need these
+        if start_time is not None:
+            self.start_day = start_time.toordinal()
+            self.start_seconds = time_of_day_seconds(start_time)
+
     def read(self, input_row):
-        now = self.makeTimestamp(input_row)
-        if now == None:
+        year_month_day = parse_int_tuple(input_row[self.date_col_idx])
+        if len(year_month_day) != 3:
+            return None
+        hour_minute_second = parse_time(input_row[self.time_col_idx])
+        if len(hour_minute_second) != 3:
             return None
-        return int((now - self.start_time).total_seconds())
+        hour, minute, second = hour_minute_second
+        day = date(*year_month_day).toordinal()
+        check_time_of_day(hour, minute, second)
+        return ((day - self.start_day) * SECONDS_PER_DAY
+                + hour * 3600 + minute * 60 + second - self.start_seconds)
     
 
 class FlightLogException(Exception):
@@ -405,36 +668,125 @@ class FlightLog:
 
     Common members:
       filename: name of input file
-      inf: open file handle for input file
+      inf: input file, opened in binary mode (see decode_lines())
       columns: list of Column objects matching the input file
       column_idx: name->column_index dictionary
       start_time: datetime object representing the first timestamp
         in the logfile.
+      data_start_offset: file position of the first line after the headers
+      quoted_fields: True if the data lines use csv quoting, so they can't
+        simply be split on commas
+      read_error: None, or the message printed if the last read stopped
+        early on a value that could not be converted
+      use_cache: the use_cache argument given to open(), which
+        read_parallel() passes on to its workers
     """
 
+    read_error = None
+
     @staticmethod
-    def open(filename):
-        # read the first line to determine the format/vendor
-        inf = open(filename, encoding='Latin-1', newline='')
-        line1 = inf.readline()
-
-        # pass the open file handle to avoid closing and reopening the file
-
-        if AvidyneFlightLog.check_first_line(line1):
-            # print('creating AvidyneFlightLog')
-            log = AvidyneFlightLog(filename, inf)
-        elif GarminFlightLog.check_first_line(line1):
-            # print('creating GarminFlightLog')
-            log = GarminFlightLog(filename, inf)
+    def open(filename, use_cache=False):
+        """
+        Open a log, figure out its format, and return the matching
+        FlightLog subclass.
+
+        If use_cache is True, what's learned from the headers is saved in
+        a sidecar file (filename + HEADER_CACHE_SUFFIX), and later opens
+        of the unchanged log load that instead of reading the headers and
+        looking for the start time again.
+        """
+        if use_cache:
+            log = FlightLog._try_load_cache(filename)
+            if log:
+                log.use_cache = use_cache
+                return log
+
+        # Read the header lines once here, and use the first one to
+        # determine the format/vendor.
+        inf, raw_lines = open_log_file(filename)
+
+        for prefix, log_class in VENDOR_PREFIXES:
+            if raw_lines[0].startswith(prefix):
+                break
         else:
             inf.close()
             raise FlightLogException('Unrecognized file format')
 
+        # pass the open file handle and the header lines to avoid
+        # closing and reopening the file or reading the headers again
+        header_lines = [line.decode(LOG_ENCODING) for line in raw_lines]
+        log = log_class(filename, inf, header_lines)
+
         # make sure constructors did their job
         assert log.columns and log.column_idx
 
+        if use_cache:
+            log._save_cache()
+        log.use_cache = use_cache
+
         return log
 
+    @staticmethod
+    def _try_load_cache(filename):
+        """
+        Used internally by open().
+        Returns a log object built from the header cache for the given
+        file, or None if there isn't an up-to-date one.
+
+        The cache is JSON, so a cache file that came along with someone
+        else's logs can't run code. It names the vendor rather than the
+        class, and VENDOR_CLASSES maps that back to a class in this module,
+        whether it was imported as flight_log or run as __main__.
+        """
+        try:
+            with open(filename + HEADER_CACHE_SUFFIX) as cache_file:
+                key, vendor, state = json.load(cache_file)
+            log_class = VENDOR_CLASSES[vendor]
+        except Exception:
+            # missing, unreadable, or from some other version
+            return None
+
+        inf, raw_lines = open_log_file(filename)
+        try:
+            if key != cache_key(HEADER_CACHE_VERSION, inf.fileno()):
+                inf.close()
+                return None
+
+            # skip the constructor; the cached state is what it would compute
+            log = log_class.__new__(log_class)
+            column_names = state.pop('column_names')
+            if state['start_time'] is not None:
+                state['start_time'] = datetime.fromisoformat(
+                    state['start_time'])
+            log.__dict__.update(state)
+            log._set_column_mappings(column_names, log.column_table)
+            log.filename = filename
+            log.inf = inf
+            log.inf.seek(log.data_start_offset)
+        except Exception:
+            # a cache file that doesn't hold what _save_cache() writes
+            inf.close()
+            return None
+
+        return log
+
+    def _save_cache(self):
+        """
+        Used internally by open().
+        Save everything the constructor computed except the file itself.
+        The columns are saved by name and looked up again when loaded,
+        which is also faster than saving a ColumnDef for every column.
+        """
+        state = {name: value for name, value in vars(self).items()
+                 if name not in ('filename', 'inf', 'columns', 'column_idx')}
+        state['column_names'] = [col.name for col in self.columns]
+        if self.start_time is not None:
+            state['start_time'] = self.start_time.isoformat()
+
+        key = cache_key(HEADER_CACHE_VERSION, self.inf.fileno())
+        save_json_cache(self.filename + HEADER_CACHE_SUFFIX,
+                        [key, self.vendor(), state])
+
 
     def __init__(self, *args):
         raise FlightLogException('FlightLog class is abstract; ' +
@@ -446,6 +798,44 @@ class FlightLog:
         """
         return None
 
+    def _has_quoted_fields(self, n_lines=10):
+        """
+        Used internally.
+        Checks whether the first few data lines contain any quotes. Some
+        Avidyne logs quote a few of their columns; Garmin logs don't.
+        This only chooses the faster tokenizer; split_lines() still
+        handles a quoted line that turns up later.
+        Leaves the file positioned at the start of the data.
+        """
+        self.inf.seek(self.data_start_offset)
+        found = any(b'"' in line for line in islice(self.inf, n_lines))
+        self.inf.seek(self.data_start_offset)
+        return found
+
+    def _rows(self, raw_lines=None):
+        """
+        Used internally.
+        Returns an iterator over the rows of fields in raw_lines, or in
+        the file from its current position, using plain comma splitting
+        unless the file needs csv.reader to handle quoting.
+        """
+        if raw_lines is None:
+            raw_lines = self.inf
+        lines = decode_lines(raw_lines)
+        if self.quoted_fields:
+            return csv.reader(lines)
+        return split_lines(lines)
+
+    def _parse_header_columns(self, line):
+        """
+        Used internally.
+        Returns the list of column names in the given header line.
+        """
+        if not line:
+            # the file doesn't even have a full set of headers
+            raise FlightLogException('File is empty')
+        return [s.strip() for s in next(csv.reader([line]))]
+
     def _set_column_mappings(self, column_names, column_table):
         """
         Used internally.
@@ -507,11 +897,162 @@ class FlightLog:
         column_names[k].
         """
 
-        result = []
+        result = [[] for name in requested_columns]
+        for chunk in self.read_chunks(requested_columns):
+            for column, values in zip(result, chunk):
+                column.extend(values)
+        return result
+
+    def read_chunks(self, requested_columns, chunk_size=8192):
+        """
+        Like read(), but generates the data in pieces of up to chunk_size
+        rows, each in the same structure-of-arrays form. This keeps the
+        working set small when the caller can process one piece at a time.
+        """
+
+        column_readers, n_input_cols_needed = \
+            self._create_column_readers(requested_columns)
+
+        assert self.inf
+        self.inf.seek(self.data_start_offset)
+        self.read_error = None
+
+        # avidyne and garmin have three header lines
+        line_no = 3
+
+        for chunk, n_rows, error in self._parse_chunks(
+                column_readers, n_input_cols_needed, self.inf, chunk_size):
+            if error:
+                row_idx, e = error
+                self.read_error = (f'Error reading {self.filename}, '
+                                   f'line {line_no + row_idx + 1}: {e}')
+                print(self.read_error)
+            yield chunk
+            if error:
+                return
+            line_no += n_rows
+
+    def read_range(self, requested_columns, start_offset, end_offset):
+        """
+        Reads the given columns from the data lines between two byte
+        offsets in the file, both of which must be at the start of a line.
+        read_parallel() uses this to parse one piece of a file.
+
+        Returns (result, n_rows, error). result is in the same form
+        read() returns, and n_rows is how many rows it holds. error is
+        None, or (row_idx, message) if the value in row row_idx of
+        this range could not be converted. As with read(), the columns
+        before the one that failed then include row row_idx and the
+        rest stop before it, so n_rows is the length of the last column.
+        Errors are returned rather than printed, so the caller can
+        report them with the line number in the whole file.
+        """
+
+        column_readers, n_input_cols_needed = \
+            self._create_column_readers(requested_columns)
+
+        self.inf.seek(start_offset)
+        raw_lines = io.BytesIO(self.inf.read(end_offset - start_offset))
+
+        result = [[] for reader in column_readers]
+        n_rows = 0
+        for chunk, n_chunk_rows, error in self._parse_chunks(
+                column_readers, n_input_cols_needed, raw_lines, 8192):
+            for column, values in zip(result, chunk):
+                column.extend(values)
+            if error:
+                row_idx, e = error
+                return result, n_rows + row_idx, (n_rows + row_idx, str(e))
+            n_rows += n_chunk_rows
+
+        return result, n_rows, None
+
+    def read_parallel(self, requested_columns, workers=None):
+        """
+        Like read(), but splits the file into pieces on line boundaries
+        and parses them in separate processes, each of which opens the
+        file again with FlightLog.open() and calls read_range().
+        workers defaults to the number of CPUs. With a single worker, or
+        a file smaller than 2 * PARALLEL_MIN_BYTES, this just calls read(),
+        since starting processes would cost more than it saves.
+        """
+
+        # check the column names here rather than in every worker
+        self._create_column_readers(requested_columns)
+
+        workers = workers or os.cpu_count() or 1
+        offsets = self._split_offsets(workers) if workers > 1 else []
+        if len(offsets) <= 2:
+            return self.read(requested_columns)
+
+        self.read_error = None
+
+        # avidyne and garmin have three header lines
+        line_no = 3
+
+        result = [[] for name in requested_columns]
+        with ProcessPoolExecutor(workers) as executor:
+            futures = [executor.submit(read_file_range, self.filename,
+                                       requested_columns, start, end,
+                                       self.use_cache)
+                       for start, end in zip(offsets, offsets[1:])]
+            for future in futures:
+                chunk, n_rows, error = future.result()
+                for column, values in zip(result, chunk):
+                    column.extend(values)
+                if error:
+                    row_idx, message = error
+                    self.read_error = (f'Error reading {self.filename}, '
+                                       f'line {line_no + row_idx + 1}: '
+                                       f'{message}')
+                    print(self.read_error)
+                    # the rest of the file is ignored, like in read()
+                    for f in futures:
+                        f.cancel()
+                    break
+                line_no += n_rows
+
+        return result
+
+    def _split_offsets(self, n_pieces):
+        """
+        Used internally by read_parallel().
+        Returns a list of byte offsets splitting the data lines of the
+        file into at most n_pieces pieces of similar size, each starting
+        at the beginning of a line. The first offset is data_start_offset
+        and the last is the end of the file. Pieces are at least
+        PARALLEL_MIN_BYTES long, so a small file is a single piece.
+
+        Rather than indexing every line, this seeks to each approximate
+        split point and skips ahead to the next line.
+        """
+        start = self.data_start_offset
+        end = os.fstat(self.inf.fileno()).st_size
+        size = end - start
+
+        n_pieces = min(n_pieces, size // PARALLEL_MIN_BYTES)
+
+        offsets = [start]
+        for i in range(1, n_pieces):
+            self.inf.seek(start + size * i // n_pieces)
+            self.inf.readline()
+            offset = self.inf.tell()
+            if offsets[-1] < offset < end:
+                offsets.append(offset)
+        offsets.append(end)
+
+        return offsets
+
+    def _create_column_readers(self, requested_columns):
+        """
+        Used internally.
+        Returns (column_readers, n_input_cols_needed): a ColumnReader for
+        each requested column, and how many fields a row must have to
+        supply all of them.
+        """
+
         column_readers = []
         n_input_cols_needed = 0
-        
-        n_cols = len(requested_columns)
 
         for name in requested_columns:
             if name == COLUMN_NAME_TIMESTAMP:
@@ -525,65 +1066,101 @@ class FlightLog:
                 reader = ColumnReader(self.columns[input_idx], input_idx)
 
             column_readers.append(reader)
-            result.append([])
             n_input_cols_needed = max(n_input_cols_needed,
                                       1 + reader.max_col_needed())
 
-        assert self.inf
-        self.inf.seek(0)
+        return column_readers, n_input_cols_needed
 
-        # avidyne and garmin have three header lines
-        self.inf.readline()
-        self.inf.readline()
-        self.inf.readline()
-        line_no = 3
+    def _parse_chunks(self, column_readers, n_input_cols_needed,
+                      raw_lines, chunk_size):
+        """
+        Used internally.
+        Parses raw_lines, an iterable of undecoded lines, in pieces of up
+        to chunk_size rows. Generates (chunk, n_rows, error) for each
+        piece, as returned by _parse_rows(), and stops after an error.
+        """
 
-        reader = csv.reader(self.inf)
-        for row in reader:
-            if len(row) < n_input_cols_needed:
-                # short row, probably end of file. skip it
+        # Collect a chunk's worth of raw rows, then convert them a column
+        # at a time. Rows are pulled and filtered in bulk so there's no
+        # per-row Python bookkeeping here.
+        reader = self._rows(raw_lines)
+        while True:
+            batch = list(islice(reader, chunk_size))
+            if not batch:
+                break
+
+            # skip short rows, probably end of file
+            rows = [row for row in batch if len(row) >= n_input_cols_needed]
+            if not rows:
                 continue
-            line_no += 1
-            for output_idx in range(n_cols):
+
+            chunk, error = self._parse_rows(column_readers, rows)
+            yield chunk, len(rows), error
+            if error:
+                return
+
+    def _parse_rows(self, column_readers, rows):
+        """
+        Used internally by _parse_chunks().
+        Converts a list of input rows into structure-of-arrays form,
+        one column at a time.
+
+        Returns (chunk, error). If some value could not be converted,
+        error is (row_idx, exception) for the row it was in. The columns
+        of chunk before the one that failed then include that row and
+        the rest stop before it. Otherwise error is None.
+        """
+        try:
+            return [reader.read_column(rows) for reader in column_readers], None
+        except Exception:
+            pass
+
+        # Something in this batch failed. Go back over it row by row to
+        # find out where, and keep what was read before that.
+        chunk = [[] for reader in column_readers]
+        for row_idx, row in enumerate(rows):
+            for output_idx, reader in enumerate(column_readers):
                 try:
-                    value = column_readers[output_idx].read(row)
+                    value = reader.read(row)
                 except Exception as e:
-                    print(f'Error reading {self.filename}, line {line_no}: {e}')
-                    return result
-                result[output_idx].append(value)
-                
-        return result
+                    return chunk, (row_idx, e)
+                chunk[output_idx].append(value)
+
+        return chunk, None
 
 
 class AvidyneFlightLog(FlightLog):
-    
-    @staticmethod
-    def check_first_line(line):
-        return line.startswith('Avidyne Engine Data Log')
 
-    def __init__(self, filename, inf):
+    # known columns, by name
+    column_table = AVIDYNE_COLUMN_TABLE
+
+    def __init__(self, filename, inf, header_lines):
         self.filename = filename
         self.inf = inf
 
-        # start from the top, because the first line was already read
-        self.inf.seek(0)
-        self.inf.readline()  # first line has already been checked
+        # the headers have already been read, so data starts here
+        self.data_start_offset = self.inf.tell()
+        self.quoted_fields = self._has_quoted_fields()
+
+        # first line has already been checked
 
         # second line contains a timestamp that will be used later
-        line2 = self.inf.readline().strip()
+        line2 = header_lines[1].strip()
 
         # third line contains column names
-        reader = csv.reader(self.inf)
+        column_names = self._parse_header_columns(header_lines[2])
+
+        reader = self._rows()
         try:
-            column_names = [s.strip() for s in reader.__next__()]
             first_entry = reader.__next__()
         except StopIteration:
-            # __next__ failed; the file doesn't even have a full set
-            # of headers
+            # __next__ failed; the file has headers but no data
             raise FlightLogException('File is empty')
 
         # set self.columns and self.column_idx
-        self._set_column_mappings(column_names, AVIDYNE_COLUMN_TABLE)
+        self._set_column_mappings(column_names, self.column_table)
+        self._cht_columns = [name for name in self.column_idx
+                             if AVIDYNE_CHT_RE.match(name)]
 
         for name in AVIDYNE_REQUIRED_COLUMNS:
             if name not in self.column_idx:
@@ -635,8 +1212,7 @@ class AvidyneFlightLog(FlightLog):
         return 'LON'
 
     def col_cht(self):
-        cht_re = re.compile(r'C\d')
-        return [name for name in self.column_idx.keys() if cht_re.match(name)]
+        return list(self._cht_columns)
 
     def col_rpm(self, all_engines = False):
         name = 'RPM'
@@ -656,33 +1232,32 @@ class AvidyneFlightLog(FlightLog):
 
 
 class GarminFlightLog(FlightLog):
-    
-    @staticmethod
-    def check_first_line(line):
-        return line.startswith('#airframe_info, log_version="1.0')
 
-    def __init__(self, filename, inf):
+    # known columns, by name
+    column_table = GARMIN_COLUMN_TABLE
+
+    def __init__(self, filename, inf, header_lines):
         self.filename = filename
         self.inf = inf
-        
-        # start from the top, because the first line was already read
-        self.inf.seek(0)
-        self.inf.readline()  # first line has already been checked
+
+        # the headers have already been read, so data starts here
+        self.data_start_offset = self.inf.tell()
+        self.quoted_fields = self._has_quoted_fields()
+
+        # first line has already been checked
 
         # second line contains units for each column
-        self.inf.readline()
 
         # third line contains column names
-        reader = csv.reader(self.inf)
-        try:
-            column_names = [s.strip() for s in reader.__next__()]
-        except StopIteration:
-            # __next__ failed; the file doesn't even have a full set
-            # of headers
-            raise FlightLogException('File is empty')
+        column_names = self._parse_header_columns(header_lines[2])
+        reader = self._rows()
 
         # set self.columns and self.column_idx
-        self._set_column_mappings(column_names, GARMIN_COLUMN_TABLE)
+        self._set_column_mappings(column_names, self.column_table)
+        self._cht_columns = [name for name in self.column_idx
+                             if GARMIN_CHT_RE.match(name)]
+        self._rpm_columns = [name for name in self.column_idx
+                             if GARMIN_RPM_RE.match(name)]
 
         for name in GARMIN_REQUIRED_COLUMNS:
             if name not in self.column_idx:
@@ -722,14 +1297,12 @@ class GarminFlightLog(FlightLog):
         return 'Longitude'
 
     def col_cht(self):
-        cht_re = re.compile(r'E\d CHT\d')
-        return [name for name in self.column_idx.keys() if cht_re.match(name)]
+        return list(self._cht_columns)
 
     def col_rpm(self, all_engines = False):
         if not all_engines:
             return 'E1 RPM'
-        rpm_re = re.compile(r'E\d RPM')
-        return [name for name in self.column_idx.keys() if rpm_re.match(name)]
+        return list(self._rpm_columns)
 
     def createTimestampColumnReader(self):
         date_col = self.column_idx.get('Lcl Date', -1)
@@ -749,6 +1322,35 @@ class GarminFlightLog(FlightLog):
             raise FlightLogException('Garmin log missing "Lcl Time" column')
         return GarminElapsedReader(self.start_time, date_col, time_col)
 
+
+
+# Log formats FlightLog.open() recognizes, by how the first line of the
+# file starts. Supporting another vendor means adding an entry here.
+VENDOR_PREFIXES = (
+    (b'Avidyne Engine Data Log', AvidyneFlightLog),
+    (b'#airframe_info, log_version="1.0', GarminFlightLog),
+)
+
+# The FlightLog subclass for each vendor() name, for loading header caches.
+VENDOR_CLASSES = {
+    VENDOR_AVIDYNE: AvidyneFlightLog,
+    VENDOR_GARMIN: GarminFlightLog,
+}
+
+
+def read_file_range(filename, requested_columns, start_offset, end_offset,
+                    use_cache=False):
+    """
+    Opens the given file and returns the result of read_range() on it.
+    This is what FlightLog.read_parallel() runs in each worker process.
+    use_cache is passed to FlightLog.open().
+    """
+    log = FlightLog.open(filename, use_cache)
+    try:
+        return log.read_range(requested_columns, start_offset, end_offset)
+    finally:
+        log.inf.close()
+
     
 def process_file(filename):
     log = FlightLog.open(filename)
@@ -764,13 +1366,13 @@ def process_file(filename):
                     log.col_rpm(),
                     *log.col_cht()]
     print('  '.join(column_names))
-    result = log.read(column_names)
-    n_cols = len(result)
-    n_rows = len(result[0])
-    for r in range(n_rows):
-        for c in range(n_cols):
-            sys.stdout.write(str(result[c][r]) + '  ')
-        sys.stdout.write('\n')
+
+    # print each chunk as it is read rather than reading the whole file first
+    # format a whole chunk at once and write it in one call, rather than
+    # writing each value separately
+    for result in log.read_chunks(column_names):
+        sys.stdout.write(''.join('  '.join(map(str, row)) + '  \n'
+                                 for row in zip(*result)))
 
     
     # print('longitudes: ' + repr(result[1]))
@@ -778,6 +1380,10 @@ def process_file(filename):
     
 
 def main(args):
+    # skip header cache files, in case they got caught in a wildcard
+    args = [filename for filename in args
+            if not filename.endswith(HEADER_CACHE_SUFFIX)]
+
     for filename in args:
         print(filename)
         try: